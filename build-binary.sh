@@ -0,0 +1,40 @@
+#!/bin/bash
+# Build a standalone claude-statusbar binary with Nuitka
+# Skips interpreter startup/site/bytecode loading on every prompt render
+
+set -e
+
+SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+cd "$SCRIPT_DIR"
+
+echo "🔨 Claude Status Bar - Standalone Binary Build"
+echo "=============================================="
+echo ""
+
+if ! python -m nuitka --version &> /dev/null; then
+    echo "❌ Nuitka not found. Install it with:"
+    echo "  pip install nuitka"
+    exit 1
+fi
+
+VERSION=$(PYTHONPATH="$SCRIPT_DIR/src" python -c "from claude_statusbar import __version__; print(__version__)")
+# Source hash in the cache path: a rebuild with the same version number
+# must not pick up the payload an older build already unpacked
+BUILD_ID=$(python -c "import hashlib, pathlib; h = hashlib.sha256(); [h.update(p.read_bytes()) for p in sorted(pathlib.Path('src/claude_statusbar').glob('*.py'))]; print(h.hexdigest()[:12])")
+
+# Unpack once into a per-build cache dir instead of a fresh temp dir on
+# every run, otherwise onefile extraction cost would eat the startup win
+PYTHONPATH="$SCRIPT_DIR/src" python -m nuitka \
+    --onefile \
+    --product-version="$VERSION" \
+    --onefile-tempdir-spec="{CACHE_DIR}/claude-statusbar/$VERSION-$BUILD_ID" \
+    --output-dir=dist/binary \
+    --output-filename=claude-statusbar \
+    --remove-output \
+    src/claude_statusbar/__main__.py
+
+echo ""
+echo "✅ Built dist/binary/claude-statusbar"
+echo ""
+echo "Point Claude Code at it in ~/.claude/settings.json:"
+echo "  \"statusLine\": {\"type\": \"command\", \"command\": \"$SCRIPT_DIR/dist/binary/claude-statusbar\"}"
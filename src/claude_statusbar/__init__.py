@@ -11,9 +11,6 @@ For Claude Code Pro/Team subscription users.
 
 __version__ = "2.0.0"
 
-from .statusbar import main, format_output, get_model_from_jsonl
-from .update_usage import fetch_usage_via_pty, parse_usage_output
-
 __all__ = [
     'main',
     'format_output',
@@ -21,3 +18,16 @@ __all__ = [
     'fetch_usage_via_pty',
     'parse_usage_output',
 ]
+
+
+def __getattr__(name):
+    # Load submodules on first access only: the updater pulls in
+    # subprocess/pty machinery the status line never needs, and the daemon
+    # client (cli -> __version__) must not pay for importing statusbar
+    if name in ('main', 'format_output', 'get_model_from_jsonl'):
+        from . import statusbar
+        return getattr(statusbar, name)
+    if name in ('fetch_usage_via_pty', 'parse_usage_output'):
+        from . import update_usage
+        return getattr(update_usage, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,7 @@
+"""Allow running as `python -m claude_statusbar` (also the frozen-binary entry)"""
+
+import sys
+
+from claude_statusbar.cli import main
+
+sys.exit(main())
@@ -2,12 +2,13 @@
 """CLI entry point for claude-statusbar"""
 
 import sys
-import argparse
 from . import __version__
 
 
-def main():
-    """Main CLI entry point"""
+def parse_args():
+    """Parse command line arguments"""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Claude Code Subscription Status Bar',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -15,6 +16,7 @@ def main():
 Examples:
   claude-statusbar          # Show current usage status
   claude-statusbar --update # Fetch fresh data from Claude /usage
+  claude-statusbar --daemon # Serve status lines from a warm background process
 
 Output format:
   🤖Op+T | 📊16% ⏱️2h30m | 📆13% ⏱️5d21h
@@ -54,23 +56,35 @@ and updated automatically by a background job (cron).
         help='Output in JSON format'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Run in the background and serve status lines over a UNIX socket'
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Main CLI entry point"""
+    # The plain status line runs on every prompt; skip argparse entirely
+    # when there are no flags to parse
+    args = parse_args() if len(sys.argv) > 1 else None
 
     if sys.version_info < (3, 9):
         print("claude-statusbar requires Python 3.9+", file=sys.stderr)
         return 1
 
     try:
-        if args.update:
+        if args is not None and args.update:
             # Run the updater
             from .update_usage import main as update_main
             update_main()
             return 0
 
-        if args.json:
+        if args is not None and args.json:
             # JSON output
             import json
-            from pathlib import Path
             from .statusbar import get_model_from_jsonl, format_model, load_usage_config
 
             cfg = load_usage_config()
@@ -89,8 +103,23 @@ and updated automatically by a background job (cron).
             print(json.dumps(output, indent=2))
             return 0
 
+        if args is not None and args.daemon:
+            from .daemon import serve
+            serve()
+            return 0
+
+        if args is None:
+            # Use a running daemon when there is one
+            from .daemon import request_line
+            line = request_line()
+            out = getattr(sys.stdout, 'buffer', None)
+            if line and out is not None:
+                out.write(line)
+                out.flush()
+                return 0
+
         # Normal status bar output
-        if args.no_color:
+        if args is not None and args.no_color:
             sys.argv.append('--no-color')
 
         from .statusbar import main as statusbar_main
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Status line daemon
+Keeps the model lookup warm and serves rendered lines over a UNIX socket,
+so each prompt only pays for a connect/read instead of a full render.
+
+Protocol: client sends b'R', daemon replies with one line and closes.
+"""
+
+import os
+import socket
+import stat
+import sys
+import time
+
+# request_line runs on every prompt, so this module keeps to cheap imports;
+# the inotify binding is only loaded by the serving side
+
+# How often the model lookup is refreshed when inotify is unavailable
+MODEL_REFRESH_SECONDS = 5
+
+
+def get_socket_path():
+    """Socket location: $XDG_RUNTIME_DIR, else a per-user file in the temp dir"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'claude-statusbar.sock')
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    # Same lookup order as tempfile.gettempdir, without importing tempfile
+    tmp_dir = os.environ.get('TMPDIR') or os.environ.get('TEMP') or os.environ.get('TMP') or '/tmp'
+    return os.path.join(tmp_dir, f'claude-statusbar-{uid}.sock')
+
+
+def request_line(path=None, timeout=0.5):
+    """Fetch a rendered status line from a running daemon, or None"""
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'getuid'):
+        return None
+    path = path or get_socket_path()
+    try:
+        # The default path may sit in a shared temp dir: only trust a socket
+        # this user created, so nobody else can feed bytes to the prompt
+        st = os.lstat(path)
+        if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(b'R')
+            chunks = []
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b''.join(chunks) or None
+
+
+class _Watcher:
+    """Track changes to the projects tree and config files via inotify"""
+
+    def __init__(self, inotify_simple, projects, config_files):
+        inotify_flags = self._flags = inotify_simple.flags
+        self._inotify = inotify_simple.INotify()
+        self._project_dirs = {}  # wd -> directory path
+        self._config_wds = set()
+        self._config_names = {p.name for p in config_files}
+        self._project_mask = (inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                              | inotify_flags.CREATE | inotify_flags.DELETE)
+        # Config/usage files are replaced atomically, so watch their parent
+        for parent in {p.parent for p in config_files}:
+            self._config_wds.add(self._inotify.add_watch(
+                parent, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO))
+        self._watch_tree(str(projects))
+
+    def _watch_tree(self, path):
+        """Watch path and every directory below it"""
+        try:
+            wd = self._inotify.add_watch(path, self._project_mask)
+        except OSError:
+            return
+        self._project_dirs[wd] = path
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        self._watch_tree(entry.path)
+        except OSError:
+            pass
+
+    def poll(self):
+        """Return (projects_changed, config_changed) since the last call"""
+        inotify_flags = self._flags
+        projects_changed = config_changed = False
+        for event in self._inotify.read(timeout=0):
+            if event.mask & inotify_flags.Q_OVERFLOW:
+                return True, True
+            if event.wd in self._config_wds:
+                if event.name in self._config_names:
+                    config_changed = True
+            elif event.wd in self._project_dirs:
+                projects_changed = True
+                if event.mask & inotify_flags.ISDIR and event.mask & inotify_flags.CREATE:
+                    self._watch_tree(os.path.join(self._project_dirs[event.wd], event.name))
+        return projects_changed, config_changed
+
+
+def _create_watcher():
+    """Build an inotify watcher, or None to fall back to periodic refresh"""
+    from .statusbar import CLAUDE_PROJECTS, CONFIG_FILE, USAGE_FILE
+
+    try:
+        import inotify_simple
+    except ImportError:
+        return None
+    if not CLAUDE_PROJECTS.is_dir():
+        return None
+    try:
+        return _Watcher(inotify_simple, CLAUDE_PROJECTS, (USAGE_FILE, CONFIG_FILE))
+    except OSError:
+        return None
+
+
+def serve(path=None):
+    """Answer render requests until interrupted"""
+    import signal
+    from .statusbar import format_output, get_model_from_jsonl, load_config, load_usage_config
+
+    if not hasattr(socket, 'AF_UNIX'):
+        raise RuntimeError("daemon mode requires UNIX domain sockets")
+    path = path or get_socket_path()
+
+    # Let SIGTERM unwind through the finally below so the socket is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    # Only replace a stale socket; taking over a live one would leave the
+    # running daemon unreachable
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.settimeout(0.5)
+            probe.connect(str(path))
+    except FileNotFoundError:
+        pass
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"a daemon is already listening on {path}")
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    bound_ino = os.stat(path).st_ino
+
+    watcher = _create_watcher()
+    model = (None, False)
+    usage = config = None
+    refreshed = None
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    conn.settimeout(1.0)
+                    if conn.recv(1) != b'R':
+                        continue
+                    # Recompute lazily: with inotify only after a change event,
+                    # otherwise on a timer for the model and per request for
+                    # the (mtime-memoized) config files
+                    now = time.monotonic()
+                    if watcher is not None:
+                        projects_changed, config_changed = watcher.poll()
+                    else:
+                        projects_changed = refreshed is not None and now - refreshed >= MODEL_REFRESH_SECONDS
+                        config_changed = True
+                    if refreshed is None or projects_changed:
+                        model = get_model_from_jsonl()
+                        refreshed = now
+                    if usage is None or config_changed:
+                        usage = load_usage_config()
+                        config = load_config()
+                    line = format_output(*model, usage, config.get('time_format', 12))
+                    conn.sendall(line.encode('utf-8') + b'\n')
+                except Exception:
+                    # A bad usage file or a dropped client only costs this
+                    # request: close without a reply so the client renders
+                    # the line itself
+                    continue
+    finally:
+        server.close()
+        # Leave the path alone if another daemon has since replaced it
+        try:
+            if os.stat(path).st_ino == bound_ino:
+                os.unlink(path)
+        except OSError:
+            pass
@@ -4,15 +4,18 @@ Claude Subscription Status
 Shows: Model+T | Session: X% Yh, Zpm | Week: X% Yd, DD/mon Ham
 """
 
+import heapq
 import json
-from datetime import datetime, timedelta
+import os
+import sys
+import time
 from pathlib import Path
 
 try:
-    import yaml
-    HAS_YAML = True
+    import orjson
+    _loads = orjson.loads
 except ImportError:
-    HAS_YAML = False
+    _loads = json.loads
 
 # ANSI colors
 CYAN = '\033[36m'
@@ -24,28 +27,69 @@ DIM = '\033[2m'
 
 USAGE_FILE = Path.home() / '.claude-usage.json'
 CONFIG_FILE = Path.home() / '.claude-statusbar.yml'
+CACHE_FILE = Path.home() / '.claude-statusbar-cache.json'
+INDEX_FILE = Path.home() / '.claude-statusbar-index.json'
+CLAUDE_PROJECTS = Path.home() / '.claude' / 'projects'
+MAX_JSONL_FILES = 30
+# Rescan an indexed project at least this often: resuming an older session
+# appends to a file that is not the remembered newest, and appends do not
+# change the directory mtime
+INDEX_RESCAN_SECONDS = 60
+READ_CHUNK_SIZE = 65536
+
+_MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+           'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+# path -> (mtime_ns, parsed data)
+_file_cache = {}
+
+def _load_cached(path, parse):
+    """Parse a file, reusing the previous result while its mtime is unchanged"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _file_cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    try:
+        data = parse(path)
+    except:
+        data = None
+    if not isinstance(data, dict):
+        data = {}
+    _file_cache[path] = (mtime_ns, data)
+    return data
+
+def _parse_config(path):
+    """Parse the YAML config file"""
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+    if yaml is not None:
+        with open(path) as f:
+            return yaml.safe_load(f)
+    # Simple fallback parser for time_format
+    data = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip().startswith('time_format:'):
+                val = line.split(':')[1].strip()
+                data['time_format'] = int(val)
+    return data
+
+def _parse_usage(path):
+    """Parse the usage JSON file"""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
 
 def load_config():
     """Load config from YAML file"""
     defaults = {
         'time_format': 12,  # 12 or 24
     }
-    if not CONFIG_FILE.exists():
-        return defaults
-    try:
-        if HAS_YAML:
-            with open(CONFIG_FILE) as f:
-                data = yaml.safe_load(f) or {}
-                defaults.update(data)
-        else:
-            # Simple fallback parser for time_format
-            with open(CONFIG_FILE) as f:
-                for line in f:
-                    if line.strip().startswith('time_format:'):
-                        val = line.split(':')[1].strip()
-                        defaults['time_format'] = int(val)
-    except:
-        pass
+    defaults.update(_load_cached(CONFIG_FILE, _parse_config))
     return defaults
 
 def load_usage_config():
@@ -56,47 +100,206 @@ def load_usage_config():
         'week_percent': None,
         'week_reset': None
     }
+    defaults.update(_load_cached(USAGE_FILE, _parse_usage))
+    return defaults
+
+def _walk_jsonl(path):
+    """Yield (mtime_ns, size, path) for session JSONL files under path"""
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _walk_jsonl(entry.path)
+                    elif entry.name.endswith('.jsonl') and 'agent-' not in entry.name:
+                        st = entry.stat()
+                        yield st.st_mtime_ns, st.st_size, entry.path
+                except OSError:
+                    continue
+    except OSError:
+        pass
+
+def _read_lines_reversed(fp):
+    """Yield the lines of a binary file from last to first"""
+    fp.seek(0, os.SEEK_END)
+    pos = fp.tell()
+    # Pieces of the line being assembled, in reverse file order. A line
+    # longer than one read is joined once at the end rather than by
+    # prepending every chunk, which would be quadratic in its length
+    parts = []
+    while pos > 0:
+        step = min(READ_CHUNK_SIZE, pos)
+        pos -= step
+        fp.seek(pos)
+        chunk = fp.read(step)
+        end = len(chunk)
+        nl = chunk.rfind(b'\n', 0, end)
+        while nl != -1:
+            parts.append(chunk[nl + 1:end])
+            line = b''.join(reversed(parts))
+            parts = []
+            if line:
+                yield line
+            end = nl
+            nl = chunk.rfind(b'\n', 0, end)
+        parts.append(chunk[:end])
+    line = b''.join(reversed(parts))
+    if line:
+        yield line
+
+def _read_json(path):
+    """Read a JSON object from path, or {} if missing/invalid"""
     try:
-        if USAGE_FILE.exists():
-            with open(USAGE_FILE) as f:
-                data = json.load(f)
-                defaults.update(data)
+        with open(path, 'rb') as f:
+            data = _loads(f.read())
+        if isinstance(data, dict):
+            return data
     except:
         pass
-    return defaults
+    return {}
+
+def _write_json_atomic(path, data):
+    """Write JSON via a temp file + os.replace so readers never see a partial file"""
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _stat_jsonl(path):
+    """(mtime_ns, size, path) for a single file, or None if it is gone"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, path
+
+def _index_entry(entry):
+    """Validate an INDEX_FILE entry; anything malformed is a cache miss (None)"""
+    if not isinstance(entry, dict):
+        return None
+    mtime, scanned, newest = entry.get('mtime'), entry.get('scanned'), entry.get('newest')
+    if type(mtime) is not int or type(scanned) is not int:
+        return None
+    if newest is not None and not isinstance(newest, str):
+        return None
+    return entry
+
+def _recent_jsonl_files(data_path):
+    """Newest session file of each project, newest first
+
+    Uses INDEX_FILE to remember each project's newest file, keyed by the
+    project directory's mtime, so unchanged projects are only rescanned
+    every INDEX_RESCAN_SECONDS.
+    """
+    now = int(time.time())
+    index = _read_json(INDEX_FILE)
+    new_index = {}
+    candidates = []
+    try:
+        with os.scandir(data_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dir_mtime = entry.stat().st_mtime_ns
+                        cached = _index_entry(index.get(entry.path))
+                        newest = None
+                        rescan = (cached is None or cached['mtime'] != dir_mtime
+                                  or now - cached['scanned'] >= INDEX_RESCAN_SECONDS)
+                        if not rescan:
+                            # Directory mtime only moves when entries are added
+                            # or removed, so re-stat the file to pick up appends
+                            newest_path = cached['newest']
+                            newest = newest_path and _stat_jsonl(newest_path)
+                            rescan = bool(newest_path) and newest is None
+                        if rescan:
+                            newest = max(_walk_jsonl(entry.path), default=None)
+                            scanned = now
+                        else:
+                            scanned = cached['scanned']
+                        new_index[entry.path] = {
+                            'mtime': dir_mtime,
+                            'newest': newest[2] if newest else None,
+                            'scanned': scanned,
+                        }
+                        if newest:
+                            candidates.append(newest)
+                    elif entry.name.endswith('.jsonl') and 'agent-' not in entry.name:
+                        st = entry.stat()
+                        candidates.append((st.st_mtime_ns, st.st_size, entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        return []
+    if new_index != index:
+        _write_json_atomic(INDEX_FILE, new_index)
+    return heapq.nlargest(MAX_JSONL_FILES, candidates)
+
+def _load_model_cache(key):
+    """Return cached (model, has_thinking) if key matches, else None"""
+    data = _read_json(CACHE_FILE)
+    if data.get('key') == key:
+        model = data.get('model')
+        # A hand-edited or foreign file must not reach format_model
+        if model is None or isinstance(model, str):
+            return model, bool(data.get('has_thinking'))
+    return None
+
+def _save_model_cache(key, model, has_thinking):
+    """Atomically write the model cache"""
+    _write_json_atomic(CACHE_FILE, {'key': key, 'model': model, 'has_thinking': has_thinking})
 
 def get_model_from_jsonl():
     """Get model and thinking from recent JSONL files"""
-    data_path = Path.home() / '.claude' / 'projects'
+    data_path = CLAUDE_PROJECTS
     if not data_path.exists():
         return None, False
 
-    jsonl_files = sorted(
-        data_path.rglob("*.jsonl"),
-        key=lambda f: f.stat().st_mtime,
-        reverse=True
-    )
+    entries = _recent_jsonl_files(data_path)
+    if not entries:
+        return None, False
+
+    # The newest file acts as a sentinel: unchanged path+mtime+size means
+    # nothing new was written since the last lookup
+    mtime_ns, size, newest = entries[0]
+    key = f"{newest}:{mtime_ns}:{size}"
+    cached = _load_model_cache(key)
+    if cached is not None:
+        return cached
 
     latest_model = None
     has_thinking = False
 
-    for f in jsonl_files[:30]:
-        if 'agent-' in f.name:
-            continue
+    # Newest messages are at the end, so read each file backwards and stop
+    # as soon as both the model and the thinking flag are known
+    for _, _, f in entries:
         try:
-            with open(f, 'r', encoding='utf-8') as fp:
-                for line in fp:
+            with open(f, 'rb') as fp:
+                for line in _read_lines_reversed(fp):
+                    # Cheap substring gate: only parse lines that can still
+                    # contribute a model or a thinking block
+                    if not ((not latest_model and b'"model"' in line)
+                            or (not has_thinking and b'"thinking"' in line)):
+                        continue
                     try:
-                        d = json.loads(line)
+                        d = _loads(line)
                         msg = d.get('message', {})
-                        m = msg.get('model')
-                        if m:
-                            latest_model = m
-                        content = msg.get('content', [])
-                        if isinstance(content, list):
-                            for block in content:
-                                if isinstance(block, dict) and block.get('type') == 'thinking':
-                                    has_thinking = True
+                        # Model and thinking blocks only appear on assistant turns
+                        if msg.get('role') != 'assistant':
+                            continue
+                        if not latest_model:
+                            latest_model = msg.get('model')
+                        if not has_thinking:
+                            content = msg.get('content', [])
+                            if isinstance(content, list):
+                                for block in content:
+                                    if isinstance(block, dict) and block.get('type') == 'thinking':
+                                        has_thinking = True
+                                        break
+                        if latest_model and has_thinking:
+                            break
                     except:
                         continue
         except:
@@ -104,41 +307,75 @@ def get_model_from_jsonl():
         if latest_model:
             break
 
+    _save_model_cache(key, latest_model, has_thinking)
     return latest_model, has_thinking
 
+# Model family -> short label
+_MODEL_NAMES = {'opus': 'Op', 'sonnet': 'So', 'haiku': 'Ha'}
+
 def format_model(model, has_thinking):
     """Format model name"""
     if not model:
         return "?"
-    if 'opus' in model.lower():
-        name = 'Op'
-    elif 'sonnet' in model.lower():
-        name = 'So'
-    elif 'haiku' in model.lower():
-        name = 'Ha'
-    else:
-        name = '?'
+    # Fast path for ids like 'claude-opus-4-1-20250805': the family is the
+    # second dash-separated part
+    parts = model.split('-', 2)
+    name = _MODEL_NAMES.get(parts[1]) if len(parts) > 1 else None
+    if name is None:
+        lowered = model.lower()
+        name = next((v for k, v in _MODEL_NAMES.items() if k in lowered), '?')
     if has_thinking:
         return f"{name}+T"
     return name
 
+_COLOR_TABLE = tuple(RED if p >= 80 else YELLOW if p >= 50 else GREEN for p in range(101))
+
 def get_color(pct):
     """Color based on percentage"""
     if pct is None:
         return DIM
+    if type(pct) is int and 0 <= pct <= 100:
+        return _COLOR_TABLE[pct]
     if pct >= 80:
         return RED
     if pct >= 50:
         return YELLOW
     return GREEN
 
+# Pre-rendered status line segments; every possible model label and
+# integer percentage is known up front
+_MODEL_SEGMENT = {
+    label: f"{CYAN}🤖 {label}{RESET}"
+    for name in ('Op', 'So', 'Ha', '?')
+    for label in (name, f"{name}+T")
+}
+_SESSION_SEGMENT = tuple(f"{get_color(p)}📊 {p}%{RESET}" for p in range(101))
+_WEEK_SEGMENT = tuple(f"{get_color(p)}🗓️ {p}%{RESET}" for p in range(101))
+
+def _pct_segment(table, icon, pct):
+    """Colored percentage segment, from the pre-rendered table when possible"""
+    if type(pct) is int and 0 <= pct <= 100:
+        return table[pct]
+    pct_str = f"{pct}%" if pct is not None else "?"
+    return f"{get_color(pct)}{icon} {pct_str}{RESET}"
+
 def parse_datetime(dt_str):
     """Parse ISO datetime string to datetime object"""
     if not dt_str:
         return None
+    from datetime import datetime
     try:
         if isinstance(dt_str, str):
-            target = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+            # Fast path for the fixed-width 'YYYY-MM-DDTHH:MM:SS' written by
+            # the updater; a UTC suffix is dropped below anyway
+            if len(dt_str) >= 19 and dt_str[10] == 'T' and dt_str[19:] in ('', 'Z', '+00:00'):
+                return datetime(
+                    int(dt_str[0:4]), int(dt_str[5:7]), int(dt_str[8:10]),
+                    int(dt_str[11:13]), int(dt_str[14:16]), int(dt_str[17:19])
+                )
+            if dt_str.endswith('Z'):
+                dt_str = dt_str[:-1] + '+00:00'
+            target = datetime.fromisoformat(dt_str)
             if target.tzinfo:
                 target = target.replace(tzinfo=None)
             return target
@@ -146,104 +383,97 @@ def parse_datetime(dt_str):
     except:
         return None
 
-def time_until(target):
+def time_until(target, now=None):
     """Calculate time until target datetime with minutes"""
     if not target:
         return "?"
 
-    now = datetime.now()
-    if target <= now:
+    if now is None:
+        now = time.time()
+    total_minutes = int(target.timestamp() - now) // 60
+    if total_minutes <= 0:
         return "0m"
 
-    diff = target - now
-    total_minutes = int(diff.total_seconds() / 60)
-    total_hours = total_minutes // 60
-    days = total_hours // 24
+    total_hours, mins = divmod(total_minutes, 60)
+    days, hours = divmod(total_hours, 24)
 
     if days > 0:
-        hours = total_hours % 24
         return f"{days}d{hours}h"
     elif total_hours > 0:
-        mins = total_minutes % 60
         return f"{total_hours}h{mins:02d}m"
     return f"{total_minutes}m"
 
-def format_session_reset(target, time_format=12):
-    """Format session reset time like '3pm' or '15h'"""
-    if not target:
-        return "?"
-
-    hour = target.hour
-    minute = target.minute
-
+def _format_clock(hour, minute, time_format=12):
+    """Format a time of day like '3pm', '2:59pm', '15h' or '14:59'"""
     if time_format == 24:
         if minute == 0:
             return f"{hour}h"
         return f"{hour}:{minute:02d}"
-    else:
-        ampm = "am" if hour < 12 else "pm"
-        hour_12 = hour % 12
-        if hour_12 == 0:
-            hour_12 = 12
-        if minute == 0:
-            return f"{hour_12}{ampm}"
-        return f"{hour_12}:{minute:02d}{ampm}"
+    ampm = "am" if hour < 12 else "pm"
+    hour_12 = hour % 12
+    if hour_12 == 0:
+        hour_12 = 12
+    if minute == 0:
+        return f"{hour_12}{ampm}"
+    return f"{hour_12}:{minute:02d}{ampm}"
+
+def format_session_reset(target, time_format=12):
+    """Format session reset time like '3pm' or '15h'"""
+    if not target:
+        return "?"
+    return _format_clock(target.hour, target.minute, time_format)
 
 def format_week_reset(target, time_format=12):
     """Format week reset like '01/jan 5am' or '01/jan 5h'"""
     if not target:
         return "?"
 
-    day = target.day
-    month = target.strftime("%b").lower()
-    hour = target.hour
-    minute = target.minute
-
-    if time_format == 24:
-        if minute == 0:
-            return f"{day:02d}/{month} {hour}h"
-        return f"{day:02d}/{month} {hour}:{minute:02d}"
-    else:
-        ampm = "am" if hour < 12 else "pm"
-        hour_12 = hour % 12
-        if hour_12 == 0:
-            hour_12 = 12
-        if minute == 0:
-            return f"{day:02d}/{month} {hour_12}{ampm}"
-        return f"{day:02d}/{month} {hour_12}:{minute:02d}{ampm}"
-
-def main():
-    # Load configs
-    config = load_config()
-    usage = load_usage_config()
-    time_fmt = config.get('time_format', 12)
+    month = _MONTHS[target.month - 1]
+    clock = _format_clock(target.hour, target.minute, time_format)
+    return f"{target.day:02d}/{month} {clock}"
 
-    # Get model
-    model, has_thinking = get_model_from_jsonl()
+def format_output(model, has_thinking, usage, time_format=12):
+    """Build the status line from model info and usage data"""
     model_str = format_model(model, has_thinking)
+    model_seg = _MODEL_SEGMENT.get(model_str) or f"{CYAN}🤖 {model_str}{RESET}"
+    now = time.time()
 
     # Session info
     s_pct = usage.get('session_percent')
     s_target = parse_datetime(usage.get('session_reset'))
-    s_time = time_until(s_target)
-    s_reset_str = format_session_reset(s_target, time_fmt)
-    s_color = get_color(s_pct)
-    s_pct_str = f"{s_pct}%" if s_pct is not None else "?"
+    s_time = time_until(s_target, now)
+    s_reset_str = format_session_reset(s_target, time_format)
 
     # Week info
     w_pct = usage.get('week_percent')
     w_target = parse_datetime(usage.get('week_reset'))
-    w_time = time_until(w_target)
-    w_reset_str = format_week_reset(w_target, time_fmt)
-    w_color = get_color(w_pct)
-    w_pct_str = f"{w_pct}%" if w_pct is not None else "?"
+    w_time = time_until(w_target, now)
+    w_reset_str = format_week_reset(w_target, time_format)
 
     # Output: 🤖 Op+T | 📊 2% 3h, 3pm | 🗓️ 1% 6d, 01/jan 5am
-    print(
-        f"{CYAN}🤖 {model_str}{RESET} | "
-        f"{s_color}📊 {s_pct_str}{RESET} {s_time}, {s_reset_str} | "
-        f"{w_color}🗓️ {w_pct_str}{RESET} {w_time}, {w_reset_str}"
+    return (
+        f"{model_seg} | "
+        f"{_pct_segment(_SESSION_SEGMENT, '📊', s_pct)} {s_time}, {s_reset_str} | "
+        f"{_pct_segment(_WEEK_SEGMENT, '🗓️', w_pct)} {w_time}, {w_reset_str}"
     )
 
+def main():
+    # Load configs
+    config = load_config()
+    usage = load_usage_config()
+    time_fmt = config.get('time_format', 12)
+
+    # Get model
+    model, has_thinking = get_model_from_jsonl()
+
+    line = format_output(model, has_thinking, usage, time_fmt)
+    # Write UTF-8 bytes directly; skips the locale-dependent text layer
+    out = getattr(sys.stdout, 'buffer', None)
+    if out is None:
+        print(line)
+        return
+    out.write(line.encode('utf-8') + b'\n')
+    out.flush()
+
 if __name__ == '__main__':
     main()
@@ -10,12 +10,82 @@ import re
 import json
 import os
 import shutil
+import signal
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 USAGE_FILE = Path.home() / '.claude-usage.json'
+CLAUDE_CACHE_FILE = Path.home() / '.claude-usage-cache.json'
+FETCH_TIMEOUT = 20  # seconds to wait for /usage to render
+PTY_READ_SIZE = 65536
+
+# /usage output patterns; one scan each covers both the session and the
+# all-models week section
+# The percentage sits within a short, bounded window after its header (the
+# progress bar in between uses unicode chars like ▌█░▓). The window stops at
+# any '%' or the next "Current" header, so a miss can neither backtrack
+# through the rest of the buffer nor steal the next section's percentage
+_PCT_RE = re.compile(
+    r'Current (session|week \(all models\))(?:[^%C]|C(?!urrent)){0,200}?(\d+)%\s*used',
+    re.IGNORECASE
+)
+# Session: "Resets 2:59pm"; week: "Resets Jan 1, 2026, 4:59am" (year optional)
+# Like _PCT_RE, the window stops at the next "Current" header so a section
+# without a reset line cannot borrow the following section's
+_RESET_RE = re.compile(
+    r'Current (session|week \(all models\))(?:[^C]|C(?!urrent))*?Resets?\s+'
+    r'(?:([A-Za-z]+\s+\d+)(?:,\s*(\d{4}))?,?\s*)?(\d+(?::\d+)?)(am|pm)',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Section name (lowercased) -> percentage key
+_PERCENT_KEYS = {
+    'session': 'session_percent',
+    'week (all models)': 'week_percent',
+}
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+# Keys copied from parsed /usage data into the usage file
+USAGE_KEYS = ('session_percent', 'session_reset', 'session_reset_hour', 'week_percent', 'week_reset')
+
+def _load_cached_claude():
+    """Return the cached claude path if the binary is unchanged, else None"""
+    try:
+        with open(CLAUDE_CACHE_FILE) as f:
+            data = json.load(f)
+        path = data['claude_path']
+        if os.stat(path).st_mtime_ns == data['mtime_ns']:
+            return path
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def _save_cached_claude(path):
+    """Remember a resolved claude path alongside its mtime"""
+    try:
+        data = {'claude_path': path, 'mtime_ns': os.stat(path).st_mtime_ns}
+        with open(CLAUDE_CACHE_FILE, 'w') as f:
+            json.dump(data, f)
+    except OSError:
+        pass
 
 def find_claude():
+    """Find claude executable, reusing the last resolved path when still valid"""
+    claude = _load_cached_claude()
+    if claude:
+        return claude
+    claude = _discover_claude()
+    # 'npx claude' is a command, not a file; only cache real paths
+    if claude and ' ' not in claude:
+        _save_cached_claude(claude)
+    return claude
+
+def _discover_claude():
     """Find claude executable in common locations"""
     # Try shutil.which first (uses PATH)
     claude = shutil.which('claude')
@@ -48,96 +118,190 @@ def find_claude():
 
     return None
 
-def parse_usage_output(text):
-    """Parse /usage output text from Claude CLI"""
-    data = {}
-
-    # Session percentage: find "XX% used" after "Current session"
-    # Use .+? to match any chars (progress bar has various unicode chars like ▌█░▓)
-    session_match = re.search(r'Current session.+?(\d+)%\s*used', text, re.DOTALL)
-    if session_match:
-        data['session_percent'] = int(session_match.group(1))
-
-    # Session reset: "Resets 2:59pm" or "Resets 3pm"
-    session_reset = re.search(r'Current session.*?Resets?\s+(\d+(?::\d+)?)(am|pm)', text, re.DOTALL | re.IGNORECASE)
-    if session_reset:
-        time_part = session_reset.group(1)  # "2:59" or "3"
-        ampm = session_reset.group(2).lower()
-
-        if ':' in time_part:
-            hour = int(time_part.split(':')[0])
-            minute = int(time_part.split(':')[1])
+def _strip_ansi(data):
+    """Strip CSI and OSC escape sequences from raw terminal output in one pass"""
+    if b'\x1b' not in data:
+        return data
+    view = memoryview(data)
+    n = len(data)
+    out = bytearray()
+    i = 0
+    while i < n:
+        # Plain text: jump straight to the next ESC
+        esc = data.find(b'\x1b', i)
+        if esc == -1:
+            out += view[i:]
+            break
+        out += view[i:esc]
+        kind = data[esc + 1] if esc + 1 < n else None
+        if kind == 0x5b:
+            # CSI: ESC [ params... final byte in 0x40-0x7e
+            i = esc + 2
+            while i < n and not 0x40 <= data[i] <= 0x7e:
+                i += 1
+            i += 1
+        elif kind == 0x5d:
+            # OSC: ESC ] ... terminated by BEL or ST (ESC \); jump to
+            # whichever comes first
+            bel = data.find(b'\x07', esc + 2)
+            st = data.find(b'\x1b\\', esc + 2)
+            if bel != -1 and (st == -1 or bel < st):
+                i = bel + 1
+            elif st != -1:
+                i = st + 2
+            else:
+                # Unterminated: keep it as text rather than drop the rest
+                out.append(0x1b)
+                i = esc + 1
         else:
-            hour = int(time_part)
-            minute = 0
-
-        if ampm == 'pm' and hour != 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
+            out.append(0x1b)
+            i = esc + 1
+    # Callers only decode the result, which bytearray supports without a copy
+    return out
+
+def _to_24h(time_part, ampm):
+    """Convert '2:59' / '3' plus 'am'/'pm' to (hour, minute) on a 24h clock"""
+    if ':' in time_part:
+        hour, minute = (int(p) for p in time_part.split(':', 1))
+    else:
+        hour, minute = int(time_part), 0
+    if ampm == 'pm' and hour != 12:
+        hour += 12
+    elif ampm == 'am' and hour == 12:
+        hour = 0
+    return hour, minute
+
+def parse_usage_output(text, now=None):
+    """Parse /usage output text from Claude CLI
+
+    now: reference time for resolving reset times (defaults to datetime.now())
+    """
+    data = {}
 
+    # Cheap literal checks first so the DOTALL scans only run when their
+    # anchor text is actually present (partial reads, error output)
+    if 'Current session' not in text and 'Current week (all models)' not in text:
+        return data
+    if now is None:
         now = datetime.now()
-        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        if target <= now:
-            target = target.replace(day=target.day + 1)
-        data['session_reset'] = target.isoformat()
-        data['session_reset_hour'] = hour
-
-    # Week percentage (all models) - use .+? for any progress bar chars
-    week_match = re.search(r'Current week \(all models\).+?(\d+)%\s*used', text, re.DOTALL)
-    if week_match:
-        data['week_percent'] = int(week_match.group(1))
-
-    # Week reset: "Resets Jan 1, 2026, 4:59am" or "Resets Dec 30, 5pm" (year optional)
-    week_reset = re.search(
-        r'Current week \(all models\).*?Resets?\s+([A-Za-z]+\s+\d+)(?:,\s*(\d{4}))?,?\s*(\d+(?::\d+)?)(am|pm)',
-        text, re.DOTALL | re.IGNORECASE
-    )
-    if week_reset:
-        date_str = week_reset.group(1)  # "Jan 1" or "Dec 30"
-        year_str = week_reset.group(2)  # "2026" or None
-        time_part = week_reset.group(3)  # "4:59" or "5"
-        ampm = week_reset.group(4).lower()
-
-        # Parse time
-        if ':' in time_part:
-            hour = int(time_part.split(':')[0])
-            minute = int(time_part.split(':')[1])
-        else:
-            hour = int(time_part)
-            minute = 0
-        if ampm == 'pm' and hour != 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
-
-        # Parse date
-        try:
-            now = datetime.now()
-            month_day = datetime.strptime(date_str, "%b %d")
 
+    # Percentages: "XX% used" after each section header
+    if '% used' in text:
+        for match in _PCT_RE.finditer(text):
+            key = _PERCENT_KEYS[match.group(1).lower()]
+            if key not in data:
+                data[key] = int(match.group(2))
+
+    # Reset lines: a partial read often has the headers but no "Resets" yet;
+    # skip the DOTALL scan then, since each header would otherwise make it
+    # search to the end of the buffer
+    for match in (_RESET_RE.finditer(text) if 'Reset' in text else ()):
+        section = match.group(1).lower()
+        date_str = match.group(2)  # "Jan 1" or "Dec 30"; week only
+        year_str = match.group(3)  # "2026" or None
+        # "2:59" or "3", then am/pm
+        hour, minute = _to_24h(match.group(4), match.group(5).lower())
+
+        if section == 'session':
+            # A dated reset belongs to a week section, never the session
+            if 'session_reset' in data or date_str:
+                continue
+            target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target <= now:
+                target += timedelta(days=1)
+            data['session_reset'] = target.isoformat()
+            data['session_reset_hour'] = hour
+            continue
+
+        if 'week_reset' in data or not date_str:
+            continue
+
+        # Parse date: "Jan 1" -> month/day without going through strptime
+        # split() rather than partition(' '): the regex allows any whitespace
+        month_name, day_str = date_str.split()
+        month = _MONTHS.get(month_name[:3].lower())
+        if month is None:
+            continue
+        try:
+            day = int(day_str)
             if year_str:
                 year = int(year_str)
             else:
                 year = now.year
                 # If date is in the past, use next year
-                test_target = datetime(year, month_day.month, month_day.day, hour, minute)
-                if test_target < now:
+                if datetime(year, month, day, hour, minute) < now:
                     year += 1
 
-            target = datetime(year, month_day.month, month_day.day, hour, minute)
+            target = datetime(year, month, day, hour, minute)
             data['week_reset'] = target.isoformat()
-        except Exception:
+        except ValueError:
             pass
 
     return data
 
-def fetch_usage_via_pty():
-    """Fetch usage via PTY - runs 'claude /usage' directly"""
+# Signals Popen(restore_signals=True) resets to SIG_DFL in the child
+_RESTORE_SIGNALS = tuple(
+    getattr(signal, name) for name in ('SIGPIPE', 'SIGXFSZ') if hasattr(signal, name)
+)
+
+def _spawn_in_pty(cmd, slave, env):
+    """Start cmd in a new session with the PTY slave as stdio
+
+    Returns the child's pid, or the Popen object on the fallback path so
+    the child stays owned (and reaped) by subprocess
+    """
+    try:
+        # posix_spawn skips Python's fork wrapper entirely. Reset the
+        # signals Popen's restore_signals would, so the child does not
+        # inherit Python's SIG_IGN for SIGPIPE/SIGXFSZ
+        return os.posix_spawnp(
+            cmd[0], cmd, env,
+            file_actions=[(os.POSIX_SPAWN_DUP2, slave, fd) for fd in (0, 1, 2)],
+            setsigdef=_RESTORE_SIGNALS,
+            setsid=True,
+        )
+    except (AttributeError, NotImplementedError):
+        # No posix_spawn (or no setsid support for it) on this platform
+        return subprocess.Popen(
+            cmd,
+            stdin=slave,
+            stdout=slave,
+            stderr=slave,
+            start_new_session=True,
+            env=env
+        )
+
+def _stop(child, timeout=2):
+    """Terminate a child (pid or Popen), escalating to SIGKILL if it outlives timeout"""
+    if isinstance(child, subprocess.Popen):
+        child.terminate()
+        try:
+            child.wait(timeout)
+        except subprocess.TimeoutExpired:
+            child.kill()
+            child.wait()
+        return
+    pid = child
+    try:
+        os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                return
+            time.sleep(0.05)
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    except (ProcessLookupError, ChildProcessError):
+        pass
+
+def fetch_usage_via_pty(now=None):
+    """Fetch usage via PTY - runs 'claude /usage' directly
+
+    now: reference time passed on to parse_usage_output
+    """
     try:
         import pty
         import select
-        import time
 
         # Find claude executable
         claude_cmd = find_claude()
@@ -149,34 +313,52 @@ def fetch_usage_via_pty():
 
         # Run 'claude /usage' directly (not interactive mode)
         cmd = [claude_cmd, '/usage'] if ' ' not in claude_cmd else claude_cmd.split() + ['/usage']
-        proc = subprocess.Popen(
-            cmd,
-            stdin=slave,
-            stdout=slave,
-            stderr=slave,
-            preexec_fn=os.setsid,
-            env={**os.environ, 'TERM': 'xterm-256color'}
-        )
+        child = _spawn_in_pty(cmd, slave, {**os.environ, 'TERM': 'xterm-256color'})
 
         os.close(slave)
 
-        # Wait for usage data to load (fixed time)
-        time.sleep(8)
-
-        # Read all available output
-        usage_output = b''
-        while True:
-            ready, _, _ = select.select([master], [], [], 0.3)
-            if ready:
+        os.set_blocking(master, False)
+        poller = select.poll()
+        poller.register(master, select.POLLIN)
+
+        # Read until the usage panel has rendered, then drain whatever is
+        # still in flight until the output goes quiet
+        # Readiness is tracked incrementally: each check only scans the new
+        # chunk plus enough overlap to catch a marker split across reads
+        deadline = time.monotonic() + FETCH_TIMEOUT
+        usage_output = bytearray()
+        ready = False
+        has_session = has_week = False
+        pct_hits = 0
+        while time.monotonic() < deadline:
+            if not poller.poll(300):
+                if ready:
+                    break
+                continue
+            # Wake-up: drain everything available with non-blocking reads
+            start = len(usage_output)
+            closed = False
+            while True:
                 try:
-                    chunk = os.read(master, 4096)
-                    if chunk:
-                        usage_output += chunk
-                    else:
-                        break
+                    chunk = os.read(master, PTY_READ_SIZE)
+                except BlockingIOError:
+                    break
                 except OSError:
+                    closed = True
                     break
-            else:
+                if not chunk:
+                    closed = True
+                    break
+                usage_output.extend(chunk)
+            if not ready:
+                has_session = has_session or usage_output.find(
+                    b'Current session', max(0, start - 14)) != -1
+                has_week = has_week or usage_output.find(
+                    b'Current week', max(0, start - 11)) != -1
+                # A match starting this far back cannot have been counted yet
+                pct_hits += usage_output.count(b'% used', max(0, start - 5))
+                ready = has_session and has_week and pct_hits >= 2
+            if closed:
                 break
 
         # Send exit
@@ -187,51 +369,67 @@ def fetch_usage_via_pty():
             pass
 
         # Cleanup
-        proc.terminate()
-        try:
-            proc.wait(timeout=2)
-        except:
-            proc.kill()
+        _stop(child)
 
+        poller.unregister(master)
         os.close(master)
 
         # Parse output
-        text = usage_output.decode('utf-8', errors='ignore')
-        # Remove ANSI codes
-        text = re.sub(r'\x1b\[[0-9;]*[a-zA-Z]', '', text)
-        text = re.sub(r'\x1b\][^\x07]*\x07', '', text)  # OSC sequences
+        # Remove ANSI codes before decoding
+        text = _strip_ansi(usage_output).decode('utf-8', errors='ignore')
 
-        return parse_usage_output(text), text
+        return parse_usage_output(text, now), text
 
     except Exception as e:
         return {'error': str(e)}, ''
 
-def update_usage_file(new_data):
-    """Merge new data into usage file"""
+def update_usage_file(new_data, now=None):
+    """Merge new data into usage file
+
+    Returns (merged data, whether the file was written)
+    """
     current = {}
     try:
-        if USAGE_FILE.exists():
-            with open(USAGE_FILE) as f:
-                current = json.load(f)
+        # Open directly; a missing file is just an empty starting point
+        with open(USAGE_FILE, 'rb') as f:
+            buf = f.read()
+        if buf:
+            current = json.loads(buf)
     except:
         pass
 
     # Update with new values (only if they exist)
-    for key in ['session_percent', 'session_reset', 'session_reset_hour', 'week_percent', 'week_reset']:
+    previous = dict(current)
+    for key in USAGE_KEYS:
         if key in new_data:
             current[key] = new_data[key]
 
-    current['last_updated'] = datetime.now().isoformat()
+    # Nothing changed: leave the file (and its mtime) alone
+    if current == previous and 'last_updated' in previous:
+        return current, False
+
+    current['last_updated'] = (now or datetime.now()).isoformat(timespec='seconds')
 
-    with open(USAGE_FILE, 'w') as f:
-        json.dump(current, f, indent=2)
+    # Write to a temp file and rename over the target so readers never see
+    # a partially written file, even if the job is killed mid-write
+    # Serialize once and hand the kernel a single write
+    payload = json.dumps(current, indent=2).encode('utf-8')
+    tmp = USAGE_FILE.with_name(USAGE_FILE.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, USAGE_FILE)
 
-    return current
+    return current, True
 
 def main():
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] Fetching usage data...")
+    # Read the clock once: the same instant stamps the log line, resolves
+    # reset times and becomes last_updated
+    now = datetime.now()
+    print(f"[{now.strftime('%H:%M:%S')}] Fetching usage data...")
 
-    data, raw = fetch_usage_via_pty()
+    data, raw = fetch_usage_via_pty(now)
 
     if 'error' in data:
         print(f"Error: {data['error']}")
@@ -242,9 +440,12 @@ def main():
         print(f"Raw output (full):\n{raw}")
         sys.exit(1)
 
-    updated = update_usage_file(data)
+    updated, written = update_usage_file(data, now)
 
-    print(f"Updated {USAGE_FILE}:")
+    if written:
+        print(f"Updated {USAGE_FILE}:")
+    else:
+        print(f"Unchanged {USAGE_FILE} (last updated {updated['last_updated']}):")
     print(json.dumps(updated, indent=2))
 
 if __name__ == '__main__':
@@ -0,0 +1,237 @@
+"""Tests for the status line: session file lookup, caches and formatting"""
+
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from claude_statusbar import statusbar
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Point every file the status line touches at a temporary HOME"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setattr(statusbar, 'USAGE_FILE', tmp_path / '.claude-usage.json')
+    monkeypatch.setattr(statusbar, 'CONFIG_FILE', tmp_path / '.claude-statusbar.yml')
+    monkeypatch.setattr(statusbar, 'CACHE_FILE', tmp_path / '.claude-statusbar-cache.json')
+    monkeypatch.setattr(statusbar, 'INDEX_FILE', tmp_path / '.claude-statusbar-index.json')
+    monkeypatch.setattr(statusbar, 'CLAUDE_PROJECTS', tmp_path / '.claude' / 'projects')
+    monkeypatch.setattr(statusbar, '_file_cache', {})
+    statusbar.CLAUDE_PROJECTS.mkdir(parents=True)
+    return tmp_path
+
+
+def assistant(model=None, thinking=False):
+    """One assistant turn as a JSONL line"""
+    content = [{'type': 'thinking', 'thinking': '...'}] if thinking else [{'type': 'text', 'text': 'hi'}]
+    message = {'role': 'assistant', 'content': content}
+    if model:
+        message['model'] = model
+    return json.dumps({'type': 'assistant', 'message': message})
+
+
+def write_session(path, lines, age=0):
+    """Write a session file and backdate its mtime by age seconds"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(line + '\n' for line in lines))
+    mtime = datetime.now().timestamp() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def append(path, line):
+    """Append a line without touching the parent directory's mtime"""
+    with open(path, 'a') as f:
+        f.write(line + '\n')
+
+
+def read_index():
+    return json.loads(statusbar.INDEX_FILE.read_text())
+
+
+# _read_lines_reversed
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4, 7, 65536])
+def test_read_lines_reversed_across_chunks(monkeypatch, chunk_size):
+    monkeypatch.setattr(statusbar, 'READ_CHUNK_SIZE', chunk_size)
+    lines = [b'first', b'x' * 25, b'', b'ab', b'last line']
+    fp = io.BytesIO(b'\n'.join(lines) + b'\n')
+    assert list(statusbar._read_lines_reversed(fp)) == [b'last line', b'ab', b'x' * 25, b'first']
+
+
+def test_read_lines_reversed_without_trailing_newline(monkeypatch):
+    monkeypatch.setattr(statusbar, 'READ_CHUNK_SIZE', 4)
+    fp = io.BytesIO(b'one\ntwo\nthree')
+    assert list(statusbar._read_lines_reversed(fp)) == [b'three', b'two', b'one']
+    assert list(statusbar._read_lines_reversed(io.BytesIO(b''))) == []
+
+
+# get_model_from_jsonl
+
+def test_model_from_newest_assistant_turn(home):
+    project = statusbar.CLAUDE_PROJECTS / 'proj'
+    write_session(project / 'old.jsonl', [assistant('claude-haiku-4')], age=600)
+    write_session(project / 'new.jsonl', [
+        assistant('claude-sonnet-4', thinking=True),
+        assistant('claude-opus-4-1-20250805'),
+        # A user turn quoting "model" must not win over the assistant turn
+        json.dumps({'type': 'user', 'message': {'role': 'user', 'content': '"model": "claude-haiku-4"'}}),
+    ])
+    assert statusbar.get_model_from_jsonl() == ('claude-opus-4-1-20250805', True)
+
+
+def test_model_none_without_sessions(home):
+    assert statusbar.get_model_from_jsonl() == (None, False)
+
+
+def test_model_cache_hit_and_invalidation(home, monkeypatch):
+    session = write_session(statusbar.CLAUDE_PROJECTS / 'proj' / 's.jsonl', [assistant('claude-sonnet-4')])
+    assert statusbar.get_model_from_jsonl() == ('claude-sonnet-4', False)
+
+    # Unchanged sentinel: served from the cache without reading the file
+    def fail(fp):
+        raise AssertionError("session file read on a cache hit")
+    with monkeypatch.context() as m:
+        m.setattr(statusbar, '_read_lines_reversed', fail)
+        assert statusbar.get_model_from_jsonl() == ('claude-sonnet-4', False)
+
+    # An append changes size/mtime, so the lookup runs again
+    append(session, assistant('claude-opus-4-1', thinking=True))
+    assert statusbar.get_model_from_jsonl() == ('claude-opus-4-1', True)
+
+
+def test_model_cache_rejects_malformed_model(home):
+    write_session(statusbar.CLAUDE_PROJECTS / 'proj' / 's.jsonl', [assistant('claude-sonnet-4')])
+    statusbar.get_model_from_jsonl()
+    cache = json.loads(statusbar.CACHE_FILE.read_text())
+    cache['model'] = ['not', 'a', 'model']
+    statusbar.CACHE_FILE.write_text(json.dumps(cache))
+    assert statusbar.get_model_from_jsonl() == ('claude-sonnet-4', False)
+
+
+# _recent_jsonl_files index
+
+def test_index_records_newest_file_per_project(home):
+    projects = statusbar.CLAUDE_PROJECTS
+    write_session(projects / 'a' / 'old.jsonl', ['{}'], age=300)
+    newest_a = write_session(projects / 'a' / 'new.jsonl', ['{}'], age=60)
+    newest_b = write_session(projects / 'b' / 'only.jsonl', ['{}'])
+
+    entries = statusbar._recent_jsonl_files(projects)
+    assert [e[2] for e in entries] == [str(newest_b), str(newest_a)]
+    index = read_index()
+    assert index[str(projects / 'a')]['newest'] == str(newest_a)
+    assert index[str(projects / 'b')]['newest'] == str(newest_b)
+
+
+def test_index_hit_skips_walk_and_sees_appends(home, monkeypatch):
+    projects = statusbar.CLAUDE_PROJECTS
+    session = write_session(projects / 'a' / 's.jsonl', ['{}'], age=60)
+    statusbar._recent_jsonl_files(projects)
+
+    def fail(path):
+        raise AssertionError("project walked on an index hit")
+    monkeypatch.setattr(statusbar, '_walk_jsonl', fail)
+    append(session, '{}')
+    (mtime_ns, size, path), = statusbar._recent_jsonl_files(projects)
+    assert path == str(session)
+    assert size == session.stat().st_size
+
+
+def test_index_miss_when_directory_changes(home):
+    projects = statusbar.CLAUDE_PROJECTS
+    write_session(projects / 'a' / 'old.jsonl', ['{}'], age=60)
+    statusbar._recent_jsonl_files(projects)
+    newer = write_session(projects / 'a' / 'new.jsonl', ['{}'])
+    assert statusbar._recent_jsonl_files(projects)[0][2] == str(newer)
+
+
+def test_index_rescans_after_append_to_older_file(home):
+    projects = statusbar.CLAUDE_PROJECTS
+    older = write_session(projects / 'a' / 'older.jsonl', ['{}'], age=600)
+    write_session(projects / 'a' / 'newer.jsonl', ['{}'], age=300)
+    statusbar._recent_jsonl_files(projects)
+
+    # Resuming the older session leaves the directory mtime alone, so it is
+    # only noticed once the project's scan is INDEX_RESCAN_SECONDS old
+    append(older, '{}')
+    index = read_index()
+    for entry in index.values():
+        entry['scanned'] -= statusbar.INDEX_RESCAN_SECONDS
+    statusbar.INDEX_FILE.write_text(json.dumps(index))
+    assert statusbar._recent_jsonl_files(projects)[0][2] == str(older)
+
+
+@pytest.mark.parametrize('entry', [
+    ['a'],
+    {'mtime': 'x', 'scanned': 0, 'newest': None},
+    {'mtime': 0, 'scanned': None, 'newest': None},
+    {'mtime': 0, 'scanned': 0, 'newest': 5},
+])
+def test_index_malformed_entry_is_a_miss(home, entry):
+    projects = statusbar.CLAUDE_PROJECTS
+    session = write_session(projects / 'a' / 's.jsonl', ['{}'])
+    statusbar.INDEX_FILE.write_text(json.dumps({str(projects / 'a'): entry}))
+    assert statusbar._recent_jsonl_files(projects)[0][2] == str(session)
+    assert read_index()[str(projects / 'a')]['newest'] == str(session)
+
+
+# Formatting
+
+@pytest.mark.parametrize('value, expected', [
+    ('2026-10-15T14:59:00', datetime(2026, 10, 15, 14, 59)),
+    ('2026-10-15T14:59:00Z', datetime(2026, 10, 15, 14, 59)),
+    ('2026-10-15T14:59:00+00:00', datetime(2026, 10, 15, 14, 59)),
+    ('2026-10-15T14:59:00.250000', datetime(2026, 10, 15, 14, 59, 0, 250000)),
+    ('2026-10-15 14:59', datetime(2026, 10, 15, 14, 59)),
+    ('not a date', None),
+    ('', None),
+    (None, None),
+])
+def test_parse_datetime(value, expected):
+    assert statusbar.parse_datetime(value) == expected
+
+
+@pytest.mark.parametrize('delta, expected', [
+    (timedelta(minutes=-5), '0m'),
+    (timedelta(seconds=30), '0m'),
+    (timedelta(minutes=45), '45m'),
+    (timedelta(hours=2, minutes=5), '2h05m'),
+    (timedelta(days=5, hours=21, minutes=10), '5d21h'),
+])
+def test_time_until(delta, expected):
+    target = datetime(2026, 10, 15, 12, 0)
+    assert statusbar.time_until(target + delta, target.timestamp()) == expected
+    assert statusbar.time_until(None) == '?'
+
+
+def test_format_output():
+    now = datetime.now().replace(microsecond=0)
+    session_reset = now + timedelta(hours=2, minutes=30, seconds=30)
+    week_reset = datetime(now.year + 1, 1, 1, 5, 0)
+    usage = {
+        'session_percent': 16,
+        'session_reset': session_reset.isoformat(),
+        'week_percent': 85,
+        'week_reset': week_reset.isoformat(),
+    }
+    line = statusbar.format_output('claude-opus-4-1', True, usage)
+    assert line.startswith(f"{statusbar.CYAN}🤖 Op+T{statusbar.RESET} | ")
+    assert f"{statusbar.GREEN}📊 16%{statusbar.RESET} 2h30m, " in line
+    assert f"{statusbar.RED}🗓️ 85%{statusbar.RESET} " in line
+    assert line.endswith(", 01/jan 5am")
+
+    line_24h = statusbar.format_output('claude-opus-4-1', True, usage, time_format=24)
+    assert line_24h.endswith(", 01/jan 5h")
+
+
+def test_format_output_without_data():
+    line = statusbar.format_output(None, False, {})
+    assert line == (
+        f"{statusbar.CYAN}🤖 ?{statusbar.RESET} | "
+        f"{statusbar.DIM}📊 ?{statusbar.RESET} ?, ? | "
+        f"{statusbar.DIM}🗓️ ?{statusbar.RESET} ?, ?"
+    )
@@ -0,0 +1,100 @@
+"""Tests for parsing Claude /usage output"""
+
+import json
+from datetime import datetime
+
+from claude_statusbar import update_usage
+from claude_statusbar.update_usage import _strip_ansi, parse_usage_output, update_usage_file
+
+NOW = datetime(2026, 10, 15, 12, 0)
+
+USAGE_TEXT = """
+Current session
+ ████████▌                                          16% used
+ Resets 2:59pm
+
+Current week (all models)
+ ██████▌                                            13% used
+ Resets Oct 20, 2026, 4:59am
+"""
+
+
+def test_parse_usage_output_normal():
+    data = parse_usage_output(USAGE_TEXT, now=NOW)
+    assert data == {
+        'session_percent': 16,
+        'session_reset': '2026-10-15T14:59:00',
+        'session_reset_hour': 14,
+        'week_percent': 13,
+        'week_reset': '2026-10-20T04:59:00',
+    }
+
+
+def test_parse_usage_output_session_reset_rolls_to_tomorrow():
+    data = parse_usage_output("Current session\n 5% used\n Resets 9am\n", now=NOW)
+    assert data['session_reset'] == '2026-10-16T09:00:00'
+    assert data['session_reset_hour'] == 9
+
+
+def test_parse_usage_output_missing_session_reset():
+    text = "Current session\n 0% used\n\nCurrent week (all models)\n 10% used\nResets Dec 30, 5pm\n"
+    data = parse_usage_output(text, now=NOW)
+    assert data == {
+        'session_percent': 0,
+        'week_percent': 10,
+        'week_reset': '2026-12-30T17:00:00',
+    }
+
+
+def test_parse_usage_output_week_reset_without_year():
+    text = "Current week (all models)\n 40% used\n Resets Jan 1, 4:59am\n"
+    data = parse_usage_output(text, now=NOW)
+    # Jan 1 has already passed this year, so it resolves to next year
+    assert data['week_reset'] == '2027-01-01T04:59:00'
+
+
+def test_parse_usage_output_no_sections():
+    assert parse_usage_output("Error: not logged in", now=NOW) == {}
+
+
+def test_strip_ansi_osc_terminators():
+    raw = (b'\x1b]8;;u\x1b\\link\x1b]8;;\x1b\\ \x1b[1mCurrent session\x1b[0m\n'
+           b' 5% used\x1b]0;title\x07\n')
+    assert _strip_ansi(raw).decode() == 'link Current session\n 5% used\n'
+
+
+def test_strip_ansi_keeps_text_after_unterminated_osc():
+    raw = b'\x1b]8;;u Current session\n \x1b[1m5% used'
+    text = _strip_ansi(raw).decode()
+    assert text.endswith('Current session\n 5% used')
+    assert parse_usage_output(text, now=NOW) == {'session_percent': 5}
+
+
+def test_parse_usage_output_week_reset_split_across_lines():
+    text = "Current week (all models)\n 40% used\n Resets Jan\n1, 2027, 4:59am\n"
+    data = parse_usage_output(text, now=NOW)
+    assert data['week_reset'] == '2027-01-01T04:59:00'
+
+
+def test_update_usage_file_skips_unchanged_writes(tmp_path, monkeypatch):
+    usage_file = tmp_path / '.claude-usage.json'
+    monkeypatch.setattr(update_usage, 'USAGE_FILE', usage_file)
+
+    data, written = update_usage_file({'session_percent': 16, 'other': 1}, now=NOW)
+    assert written
+    assert data == {'session_percent': 16, 'last_updated': '2026-10-15T12:00:00'}
+    assert json.loads(usage_file.read_text()) == data
+
+    later = datetime(2026, 10, 15, 12, 5)
+    mtime = usage_file.stat().st_mtime_ns
+    data, written = update_usage_file({'session_percent': 16}, now=later)
+    assert not written
+    assert data['last_updated'] == '2026-10-15T12:00:00'
+    assert usage_file.stat().st_mtime_ns == mtime
+
+    data, written = update_usage_file({'session_percent': 20}, now=later)
+    assert written
+    assert json.loads(usage_file.read_text()) == {
+        'session_percent': 20,
+        'last_updated': '2026-10-15T12:05:00',
+    }
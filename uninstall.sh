@@ -120,6 +120,14 @@ remove_files() {
         echo -e "${GREEN}✓${NC} Removed ~/.claude-usage-update.log"
     fi
 
+    # Lookup caches
+    for cache in .claude-usage-cache.json .claude-statusbar-cache.json .claude-statusbar-index.json; do
+        if [ -f "$HOME/$cache" ]; then
+            rm "$HOME/$cache"
+            echo -e "${GREEN}✓${NC} Removed ~/$cache"
+        fi
+    done
+
     echo -e "${GREEN}✓${NC} Config files cleaned"
 }
 